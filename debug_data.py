@@ -1,8 +1,9 @@
-import pandas as pd
 import sys
 import os
 
-csv_path = 'raw_measurements.csv'
+from data_loader import CSV_PATH, load_measurements
+
+csv_path = CSV_PATH
 if not os.path.exists(csv_path):
     print(f"File not found in current dir: {os.getcwd()}/{csv_path}")
     # Try looking one level up just in case
@@ -12,19 +13,19 @@ if not os.path.exists(csv_path):
 print(f"Reading from: {csv_path}")
 
 try:
-    df = pd.read_csv(csv_path)
+    df = load_measurements(csv_path, columns=['category', 'library', 'status'])
     print(f"Total rows: {len(df)}")
-    print("\nCategories found:", df['category'].unique())
+    print("\nCategories found:", df['category'].unique().astype('str'))
     
     print("\nCounts per category:")
     print(df['category'].value_counts())
     
     # Check if we have successes in other categories
     print("\nSuccesses by category (Correct status count):")
-    successes = df[df['status'] == 'Correct'].groupby('category').size()
+    successes = df[df['status'] == 'Correct'].groupby('category', observed=True).size()
     print(successes)
 
-    print("\nLibraries found:", df['library'].unique())
+    print("\nLibraries found:", df['library'].unique().astype('str'))
 
 except Exception as e:
     print(e)
@@ -1,8 +1,15 @@
+import numpy as np
 import pandas as pd
 
-df = pd.read_csv('raw_measurements.csv')
+from data_loader import load_measurements
+
+df = load_measurements(columns=['status', 'decoded_text'])
 incorrect = df[df['status'] == 'Incorrect']
 
 print("Decoded text counts for Incorrect status:")
-print(incorrect['decoded_text'].value_counts())
-
+# Count via categorical codes instead of hashing every string; -1 codes are missing values
+decoded = pd.Categorical(incorrect['decoded_text'])
+codes = decoded.codes[decoded.codes >= 0]
+counts = np.bincount(codes, minlength=len(decoded.categories))
+order = np.argsort(-counts, kind='stable')
+print(pd.Series(counts[order], index=decoded.categories[order], name='count').rename_axis('decoded_text'))
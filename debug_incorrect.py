@@ -1,12 +1,11 @@
-import pandas as pd
+from data_loader import head_where
 
-df = pd.read_csv('raw_measurements.csv')
-incorrect = df[df['status'] == 'Incorrect']
+incorrect = head_where('status', 'Incorrect', columns=['category', 'expected_text', 'decoded_text'], n=10)
 
 print("Sample Incorrect comparisons:")
-for index, row in incorrect.head(10).iterrows():
-    print(f"Cat: {row['category']}")
-    print(f"  Exp: '{row['expected_text']}'")
-    print(f"  Got: '{row['decoded_text']}'")
-    print("-" * 20)
+# Plain tuples avoid boxing a Series per row as iterrows() does
+print("\n".join(
+    f"Cat: {cat}\n  Exp: '{exp}'\n  Got: '{got}'\n" + "-" * 20
+    for cat, exp, got in incorrect[['category', 'expected_text', 'decoded_text']].itertuples(index=False, name=None)
+))
 
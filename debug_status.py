@@ -1,10 +1,11 @@
-import pandas as pd
+from data_loader import load_measurements
 
-df = pd.read_csv('raw_measurements.csv')
+df = load_measurements(columns=['category', 'status', 'expected_text', 'decoded_text'])
 non_decoding = df[df['category'] != 'decoding']
 
 print("Status counts for non-decoding categories:")
-print(non_decoding['status'].value_counts())
+# Categorical value_counts() would also list statuses with no rows here
+print(non_decoding['status'].cat.remove_unused_categories().value_counts())
 
 print("\nSample rows from non-decoding:")
 print(non_decoding[['category', 'status', 'expected_text', 'decoded_text']].head(10))
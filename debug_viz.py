@@ -1,6 +1,8 @@
 import json
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import PatchCollection
+import numpy as np
 from PIL import Image
 import sys
 import os
@@ -42,16 +44,15 @@ def visualize_debug(json_path="debug_output.json"):
 
     # Plot Ground Truth
     if data.get('ground_truth_sets'):
-        for set_idx, pts in enumerate(data['ground_truth_sets']):
-            # Draw polygon
-            poly = patches.Polygon(pts, linewidth=3, edgecolor=colors['GroundTruth'], facecolor='none', label='Ground Truth' if set_idx == 0 else "")
-            ax.add_patch(poly)
-            # Draw points
-            for i, (x, y) in enumerate(pts):
-                plt.plot(x, y, 'o', color=colors['GroundTruth'])
-                # plt.text(x, y, str(i), color='white', fontsize=12, fontweight='bold')
+        # Draw all polygons as one collection
+        polys = [patches.Polygon(pts) for pts in data['ground_truth_sets']]
+        ax.add_collection(PatchCollection(polys, linewidth=3, edgecolor=colors['GroundTruth'], facecolor='none'))
+        # Draw all points in a single scatter
+        gt_xy = np.concatenate([np.asarray(pts, dtype=float) for pts in data['ground_truth_sets']])
+        ax.scatter(gt_xy[:, 0], gt_xy[:, 1], marker='o', color=colors['GroundTruth'], label='Ground Truth')
 
     # Plot Detections
+    det_points = {}
     for det in data['detections']:
         lib = det['library']
         status = det['status']
@@ -64,9 +65,12 @@ def visualize_debug(json_path="debug_output.json"):
             # Draw polygon
             poly = patches.Polygon(points, linewidth=2, edgecolor=color, facecolor='none', linestyle='--', label=f'{lib} ({status})')
             ax.add_patch(poly)
-             # Draw points
-            for i, (x, y) in enumerate(points):
-                plt.plot(x, y, 'x', color=color)
+            det_points.setdefault(color, []).append(np.asarray(points, dtype=float))
+
+    # Draw detection points with one scatter per color
+    for color, pts in det_points.items():
+        xy = np.concatenate(pts)
+        ax.scatter(xy[:, 0], xy[:, 1], marker='x', color=color)
 
     # Legend
     handles, labels = ax.get_legend_handles_labels()
@@ -0,0 +1,18 @@
+import numba
+import numpy as np
+
+
+# Imported lazily by viz._success_counts, so only runs big enough to use the
+# kernel pay for importing numba.
+@numba.njit(parallel=True, cache=True)
+def parallel_success_counts(codes, is_correct, n_groups, n_threads):
+    # Each thread counts its own slice into a private row, so the
+    # parallel loop needs no atomics; rows are summed at the end.
+    step = (len(codes) + n_threads - 1) // n_threads
+    attempts = np.zeros((n_threads, n_groups), dtype=np.int64)
+    successes = np.zeros((n_threads, n_groups), dtype=np.int64)
+    for t in numba.prange(n_threads):
+        for i in range(t * step, min((t + 1) * step, len(codes))):
+            attempts[t, codes[i]] += 1
+            successes[t, codes[i]] += is_correct[i]
+    return attempts.sum(axis=0), successes.sum(axis=0)